@@ -9,6 +9,7 @@ using an optional escape mechanism.
 
 Usage:
     python extract_comments.py <input_paths>... [-o output.xlsx] [-e <extensions>...] [--escape-tabs | --no-escape-tabs]
+                               [--keep-intermediary]
 
 Example:
     python extract_comments.py ./src -o my_comment_report.xlsx -e "*.cpp" "*.h" --escape-tabs
@@ -21,7 +22,11 @@ import os
 import re
 import sys
 import argparse
+import mmap
 import shutil
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 try:
     from openpyxl import Workbook
@@ -29,8 +34,30 @@ except ImportError:
     print("Please install openpyxl: pip install openpyxl")
     sys.exit(1)
 
-# Global container for Excel rows.
-excel_rows = []
+# Regex for single-line and multi-line comments, compiled once for all files.
+# The explicit character classes avoid the per-character "$" checks of a lazy ".*?$".
+# String literals, character literals and raw string openers (R"delim() are matched too,
+# so that comment markers inside literals (e.g. "http://...") are not treated as comments.
+COMMENT_PATTERN = re.compile(
+    r'//[^\n]*|/\*[\s\S]*?\*/'
+    r'|"(?:\\[\s\S]|[^"\\\n])*"'
+    r"|'(?:\\[\s\S]|[^'\\\n])*'"
+    r'|R"[^(\s"\\]{0,16}\('
+)
+
+# Regex for the placeholders written in place of comments. The capturing group makes
+# split() return [text, index, text, index, ..., text].
+PLACEHOLDER_PATTERN = re.compile(r'PLACEHOLDER_([\w.\-]+)')
+
+# Regex for the block delimiter lines of the bulk translation file, used to split it into blocks.
+BULK_DELIMITER_PATTERN = re.compile(r'^<\|\|.*\|\|>$\n?', re.MULTILINE)
+
+# Buffer size for the translation files. TextIOWrapper already batches the per-line
+# write() calls, so a large buffer is what cuts the number of write syscalls.
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Source files at least this large are memory-mapped instead of read into a bytes object.
+MMAP_THRESHOLD = 1 << 20
 
 def parse_arguments():
     parser = argparse.ArgumentParser(
@@ -50,26 +77,39 @@ def parse_arguments():
     group.add_argument("--no-escape-tabs", dest="escape_tabs", action="store_false",
                        help="Disable tab escaping; leave tab characters intact.")
     parser.set_defaults(escape_tabs=True)
+    parser.add_argument("--keep-intermediary", action="store_true",
+                        help="Also write the source files with placeholders to intermediary_dir (for debugging).")
     return parser.parse_args()
 
 def discover_files(input_paths, extensions):
     """Discover files from provided files and directories matching the given extensions."""
+    # Normalize the extensions once; str.endswith accepts a tuple of suffixes.
+    suffixes = tuple(frozenset(ext.replace("*", "").lower() for ext in extensions))
     found_files = set()
     for path in input_paths:
         if os.path.isfile(path):
-            for ext in extensions:
-                ext_norm = ext.replace("*", "")
-                if path.lower().endswith(ext_norm.lower()):
-                    found_files.add(os.path.abspath(path))
-                    break
+            if path.lower().endswith(suffixes):
+                found_files.add(os.path.abspath(path))
         elif os.path.isdir(path):
-            for root, dirs, files in os.walk(path):
-                for file in files:
-                    for ext in extensions:
-                        ext_norm = ext.replace("*", "")
-                        if file.lower().endswith(ext_norm.lower()):
-                            found_files.add(os.path.abspath(os.path.join(root, file)))
-                            break
+            pending_dirs = [path]
+            while pending_dirs:
+                subdirs = []
+                try:
+                    entries = os.scandir(pending_dirs.pop())
+                except OSError:
+                    # Unreadable directories are skipped, as os.walk does.
+                    continue
+                with entries:
+                    for entry in entries:
+                        # DirEntry caches the file type, so these checks avoid extra stat() calls.
+                        # Symlinked directories are not followed, matching os.walk's default.
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry)
+                        elif entry.name.lower().endswith(suffixes) and entry.is_file():
+                            found_files.add(os.path.abspath(entry.path))
+                # Descend in inode order to reduce seeking on spinning disks.
+                subdirs.sort(key=lambda entry: entry.inode())
+                pending_dirs.extend(entry.path for entry in reversed(subdirs))
         else:
             print(f"Warning: {path} is not a file or directory.")
     return list(found_files)
@@ -82,52 +122,142 @@ def clean_multiline_lines(lines):
     cleaned = []
     for line in lines:
         # Remove leading whitespace, one or more asterisks, and an optional following space.
-        cleaned_line = re.sub(r'^\s*\*+\s?', '', line)
-        cleaned.append(cleaned_line)
+        # Plain string methods are used instead of a regex call per line.
+        stripped = line.lstrip()
+        body = stripped.lstrip("*")
+        if len(body) == len(stripped):
+            # No leading asterisks; the line is kept unchanged.
+            cleaned.append(line)
+            continue
+        if body[:1].isspace():
+            body = body[1:]
+        cleaned.append(body)
     return cleaned
 
-def extract_comments_from_content(content, filename):
+class CommentBlocks:
+    """
+    Comment blocks stored as parallel lists (a struct of arrays) rather than one dictionary per block
+    and one tuple per segment, which avoids allocating millions of small Python objects on large codebases.
+
+    Per block i:
+       - block_file[i]: The full filename (with extension).
+       - block_base[i]: The base name of block_file[i], computed once per file.
+       - block_id[i]: An integer (per file, starting at 1).
+       - block_type[i]: "single-line" or "multi-line".
+       - block_seg_start[i]: Position of the block's first segment in the segment lists.
+
+    Per segment, in block order:
+       - seg_index: The unique comment index.
+       - seg_text: The comment segment text.
+       - seg_trans: The text as written to the segmented and TSV translation files.
+    """
+
+    def __init__(self):
+        self.block_file = []
+        self.block_base = []
+        self.block_id = array("q")
+        self.block_type = []
+        self.block_seg_start = array("q")
+        self.seg_index = []
+        self.seg_text = []
+        self.seg_trans = []
+
+    def __len__(self):
+        return len(self.block_file)
+
+    def add_block(self, file, base, block_id, block_type):
+        """Start a new block; segments added afterwards belong to it."""
+        self.block_file.append(file)
+        self.block_base.append(base)
+        self.block_id.append(block_id)
+        self.block_type.append(block_type)
+        self.block_seg_start.append(len(self.seg_index))
+
+    def add_segment(self, index, text, trans):
+        """Add a segment to the most recently added block."""
+        self.seg_index.append(index)
+        self.seg_text.append(text)
+        self.seg_trans.append(trans)
+
+    def extend(self, other):
+        """Append all blocks of another CommentBlocks, e.g. the result of one file."""
+        offset = len(self.seg_index)
+        self.block_file.extend(other.block_file)
+        self.block_base.extend(other.block_base)
+        self.block_id.extend(other.block_id)
+        self.block_type.extend(other.block_type)
+        self.block_seg_start.extend(start + offset for start in other.block_seg_start)
+        self.seg_index.extend(other.seg_index)
+        self.seg_text.extend(other.seg_text)
+        self.seg_trans.extend(other.seg_trans)
+
+    def segment_slice(self, i):
+        """Return the slice of the segment lists that belongs to block i."""
+        end = self.block_seg_start[i + 1] if i + 1 < len(self.block_seg_start) else len(self.seg_index)
+        return slice(self.block_seg_start[i], end)
+
+def skip_literal(content, token, start, end):
+    """
+    Return the position just past a string or character literal matched by COMMENT_PATTERN.
+    A quote inside a numeric literal, i.e. one whose preceding run of identifier characters and
+    separators starts with a digit (1'000, 0x1'FF), is a digit separator rather than the start of a
+    character literal, so scanning resumes right after it. A quote after an encoding prefix
+    (L'x', u'x', U'x', u8'x') does start a character literal and is skipped as a whole.
+    For raw strings, the matching )delim" terminator is looked up directly.
+    """
+    if token[0] == "'":
+        run_start = start
+        while run_start > 0 and (content[run_start - 1].isalnum() or content[run_start - 1] in "_'"):
+            run_start -= 1
+        if content[run_start:start][:1].isdigit():
+            return start + 1
+        return end
+    if token[0] == "R":
+        terminator = ")" + token[2:-1] + '"'
+        close = content.find(terminator, end)
+        return end if close == -1 else close + len(terminator)
+    return end
+
+def extract_comments_from_content(content, filename, do_escape_tabs=True):
     """
     Given the content of a file and its filename, extract comments and return:
       - new_content: The file content with comments replaced by unique placeholders.
-      - blocks: A list of comment blocks extracted from this file.
+      - blocks: A CommentBlocks holding the comment blocks extracted from this file.
     
-    Each comment block is represented as a dictionary with:
-       - file: The full filename (with extension).
-       - block_id: An integer (per file, starting at 1).
-       - type: "single-line" or "multi-line".
-       - segments: A list of tuples (index, comment_segment_text).
+    Each segment's translation text (seg_trans) is escaped once here with escape_tabs()
+    if do_escape_tabs is True, otherwise it is the segment text itself.
     
     Placeholders are inserted in the file to maintain code integrity.
     """
-    # Regex for single-line and multi-line comments.
-    pattern = re.compile(r'//.*?$|/\*.*?\*/', re.MULTILINE | re.DOTALL)
     new_content_parts = []
     last_idx = 0
-    blocks = []
+    blocks = CommentBlocks()
     file_block_counter = 1
     base = os.path.basename(filename)  # full filename including extension
 
-    for m in pattern.finditer(content):
+    pos = 0
+    while True:
+        m = COMMENT_PATTERN.search(content, pos)
+        if m is None:
+            break
         start, end = m.span()
+        comment_text = m.group()
+        if comment_text[0] != "/":
+            # A literal; skip over it without touching the content.
+            pos = skip_literal(content, comment_text, start, end)
+            continue
         # Append content before the comment.
         new_content_parts.append(content[last_idx:start])
-        comment_text = m.group()
 
         if comment_text.strip().startswith("//"):
             # Single-line comment processing.
             comment_type = "single-line"
             seg_text = comment_text[2:].strip()  # remove the '//' marker.
             index = f"{base}-{file_block_counter:03d}-01"
-            block = {
-                "file": filename,
-                "block_id": file_block_counter,
-                "type": comment_type,
-                "segments": [(index, seg_text)]
-            }
-            blocks.append(block)
-            excel_rows.append((filename, comment_type, index, seg_text))
-            placeholder = f"//PLACEHOLDER_{index}"
+            trans_text = escape_tabs(seg_text) if do_escape_tabs else seg_text
+            blocks.add_block(filename, base, file_block_counter, comment_type)
+            blocks.add_segment(index, seg_text, trans_text)
+            placeholder = "//PLACEHOLDER_" + index
             new_content_parts.append(placeholder)
             file_block_counter += 1
 
@@ -141,59 +271,131 @@ def extract_comments_from_content(content, filename):
                 inner = comment_text[2:-2]  # remove '/*' and '*/'
             lines = inner.splitlines()
             lines = clean_multiline_lines(lines)
-            segments = []
+            blocks.add_block(filename, base, file_block_counter, comment_type)
             placeholder_lines = []
+            # The index prefix is formatted once per block rather than once per segment.
+            index_prefix = f"{base}-{file_block_counter:03d}-"
             seg_counter = 1
             for line in lines:
                 seg_line = line.strip()
                 # Skip completely empty lines (but if all lines are empty, we add one empty segment).
                 if seg_line == "":
                     continue
-                index = f"{base}-{file_block_counter:03d}-{seg_counter:02d}"
-                segments.append((index, seg_line))
-                excel_rows.append((filename, comment_type, index, seg_line))
-                placeholder_lines.append(f"PLACEHOLDER_{index}")
+                index = index_prefix + f"{seg_counter:02d}"
+                trans_text = escape_tabs(seg_line) if do_escape_tabs else seg_line
+                blocks.add_segment(index, seg_line, trans_text)
+                placeholder_lines.append("PLACEHOLDER_" + index)
                 seg_counter += 1
-            if not segments:
-                index = f"{base}-{file_block_counter:03d}-01"
-                segments.append((index, ""))
-                excel_rows.append((filename, comment_type, index, ""))
-                placeholder_lines.append(f"PLACEHOLDER_{index}")
-            block = {
-                "file": filename,
-                "block_id": file_block_counter,
-                "type": comment_type,
-                "segments": segments
-            }
-            blocks.append(block)
+            if not placeholder_lines:
+                index = index_prefix + "01"
+                blocks.add_segment(index, "", "")
+                placeholder_lines.append("PLACEHOLDER_" + index)
             file_block_counter += 1
             # Rebuild the multi-line placeholder with preserved comment delimiters.
             placeholder = "/*\n" + "\n".join(placeholder_lines) + "\n*/"
             new_content_parts.append(placeholder)
-        last_idx = end
+        pos = last_idx = end
 
     new_content_parts.append(content[last_idx:])
     new_content = "".join(new_content_parts)
     return new_content, blocks
 
+def encode_source_text(text):
+    """
+    Encode text as it is written to disk: UTF-8, with newlines converted to os.linesep as text mode would.
+    """
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode("utf-8")
+
+def write_source_file(path, text):
+    """
+    Encode text once and write it to path with a single binary write. The data goes to a temporary
+    file next to path that is then moved into place with os.replace(), so an interrupted run never
+    leaves a partially written file. Returns the number of bytes written.
+    """
+    data = encode_source_text(text)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return len(data)
+
 def write_intermediary_file(original_file, new_content, intermediary_dir):
     """
     Write the new content (with placeholders) to the intermediary directory,
-    preserving the relative path of the original file.
+    preserving the relative path of the original file. Returns the size of the written file in bytes.
     """
     rel_path = os.path.relpath(original_file, os.getcwd())
     dest_path = os.path.join(intermediary_dir, rel_path)
     os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    with open(dest_path, "w", encoding="utf-8") as f:
-        f.write(new_content)
+    return write_source_file(dest_path, new_content)
 
-def generate_excel_report(excel_rows, excel_filename):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Comments"
+def read_source_file(path):
+    """
+    Read a source file as UTF-8 text, with newlines normalized to "\n" as text mode would do.
+    Files of at least MMAP_THRESHOLD bytes are memory-mapped and decoded directly from the mapping,
+    so the raw bytes are not copied into a separate Python object next to the decoded text.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            content = f.read().decode("utf-8")
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                content = str(mm, "utf-8")
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+def process_file(file, intermediary_dir, do_escape_tabs):
+    """
+    Extract the comments of a single file in a worker process. The content with placeholders is
+    returned to the parent, which keeps it in memory for the re-insertion phase; it is only written
+    to intermediary_dir when one is given.
+    Returns a tuple (new_content, blocks, intermediary_size, error); error is set if the file could not be read.
+    intermediary_size is the encoded size of new_content in bytes, whether or not it was written.
+    """
+    try:
+        content = read_source_file(file)
+    except Exception as e:
+        return None, None, 0, e
+    new_content, blocks = extract_comments_from_content(content, file, do_escape_tabs)
+    if intermediary_dir is not None:
+        intermediary_size = write_intermediary_file(file, new_content, intermediary_dir)
+    else:
+        intermediary_size = len(encode_source_text(new_content))
+    return new_content, blocks, intermediary_size, None
+
+def iter_excel_rows(blocks_all):
+    """
+    Yield the Excel report rows (file, type, index, segment) for the given comment blocks.
+    Rows are produced on demand from the blocks, so they never need to be held in memory as a separate list.
+    """
+    for i in range(len(blocks_all)):
+        file = blocks_all.block_file[i]
+        comment_type = blocks_all.block_type[i]
+        seg_slice = blocks_all.segment_slice(i)
+        for index, seg in zip(blocks_all.seg_index[seg_slice], blocks_all.seg_text[seg_slice]):
+            yield (file, comment_type, index, seg)
+
+def generate_excel_report(row_iter, excel_filename):
+    """
+    Write the Excel report using openpyxl's write-only mode, so rows are streamed to the
+    worksheet instead of being held in memory as individual cell objects.
+    row_iter may be any iterable of rows, such as the generator returned by iter_excel_rows().
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Comments")
     ws.append(["File Name", "Comment Type", "Comment Index", "Comment Segment"])
-    for row in excel_rows:
-        ws.append(list(row))
+    for row in row_iter:
+        ws.append(row)
     try:
         wb.save(excel_filename)
         print(f"Excel report saved as {excel_filename}")
@@ -212,45 +414,40 @@ def unescape_tabs(text):
     """
     return text.replace(r"\t", "\t")
 
-def generate_translation_files(blocks_all, base_dir, do_escape_tabs):
+def generate_translation_files(blocks_all, base_dir):
     """
     Generate three translation files in the current working directory:
       - comments_to_translate_segmented.txt
       - comments_to_translate_tsv.txt
       - comments_to_translate_bulk.txt
 
-    The behavior of tab escaping is controlled by do_escape_tabs (True/False).
+    The segmented and TSV files use each segment's translation text (seg_trans), which already has
+    tab escaping applied (or not) according to the do_escape_tabs setting used during extraction.
     """
     segmented_filename = os.path.join(base_dir, "comments_to_translate_segmented.txt")
     tsv_filename = os.path.join(base_dir, "comments_to_translate_tsv.txt")
     bulk_filename = os.path.join(base_dir, "comments_to_translate_bulk.txt")
 
     # Segmented translation file.
-    with open(segmented_filename, "w", encoding="utf-8") as f_seg:
-        for block in blocks_all:
-            for (index, seg) in block["segments"]:
-                seg_text = escape_tabs(seg) if do_escape_tabs else seg
-                f_seg.write(f"{index} {seg_text}\n")
+    with open(segmented_filename, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f_seg:
+        for index, seg_text in zip(blocks_all.seg_index, blocks_all.seg_trans):
+            f_seg.write(f"{index} {seg_text}\n")
     print(f"Segmented translation file created: {segmented_filename}")
 
     # TSV translation file.
-    with open(tsv_filename, "w", encoding="utf-8") as f_tsv:
-        line_number = 1
-        for block in blocks_all:
-            seg_texts = [escape_tabs(seg) if do_escape_tabs else seg for (idx, seg) in block["segments"]]
-            joined_segments = r'\t'.join(seg_texts)
-            f_tsv.write(f"{line_number:04d} {joined_segments}\n")
-            line_number += 1
+    with open(tsv_filename, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f_tsv:
+        for i in range(len(blocks_all)):
+            joined_segments = r'\t'.join(blocks_all.seg_trans[blocks_all.segment_slice(i)])
+            f_tsv.write(f"{i + 1:04d} {joined_segments}\n")
     print(f"TSV translation file created: {tsv_filename}")
 
     # Bulk translation file.
-    with open(bulk_filename, "w", encoding="utf-8") as f_bulk:
-        for block in blocks_all:
-            base = os.path.basename(block["file"])
-            delimiter = f"<||{base}_{block['block_id']:03d}_block_delimiter||>"
-            f_bulk.write(delimiter + "\n")
-            for (idx, seg) in block["segments"]:
-                f_bulk.write(seg + "\n")
+    with open(bulk_filename, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f_bulk:
+        for i in range(len(blocks_all)):
+            delimiter = f"<||{blocks_all.block_base[i]}_{blocks_all.block_id[i]:03d}_block_delimiter||>"
+            # One write per block: the delimiter line followed by all of its segment lines.
+            segs = blocks_all.seg_text[blocks_all.segment_slice(i)]
+            f_bulk.write(delimiter + "\n" + "\n".join(segs) + "\n")
         f_bulk.write("\n")
     print(f"Bulk translation file created: {bulk_filename}")
 
@@ -269,15 +466,21 @@ def detect_translation_format(translated_filename):
     """
     Detect the translation file format used in translated_comments.txt.
     Returns one of: "segmented", "tsv", or "bulk".
+
+    Only as much of the file as needed is read: a bulk file starts with a block delimiter,
+    and a TSV file is recognized by the first tab character, so the file is streamed
+    line by line and the scan stops at the first match.
     """
-    with open(translated_filename, "r", encoding="utf-8") as f:
-        content = f.read().strip()
-    if content.startswith("<||") or "<||" in content:
-        return "bulk"
-    elif "\t" in content:
-        return "tsv"
-    else:
-        return "segmented"
+    with open(translated_filename, "rb") as f:
+        if b"<||" in f.read(64):
+            return "bulk"
+        f.seek(0)
+        for line in f:
+            if b"<||" in line:
+                return "bulk"
+            if b"\t" in line:
+                return "tsv"
+    return "segmented"
 
 def parse_translated_comments(translated_filename, translation_format, blocks_all):
     """
@@ -286,7 +489,12 @@ def parse_translated_comments(translated_filename, translation_format, blocks_al
     """
     translation_mapping = {}
     with open(translated_filename, "r", encoding="utf-8") as f:
-        lines = [line.rstrip("\n") for line in f.readlines()]
+        content = f.read()
+    if translation_format != "bulk":
+        lines = content.split("\n")
+        if lines[-1] == "":
+            # Drop the empty string after the final newline, as readlines() would.
+            lines.pop()
 
     if translation_format == "segmented":
         for line in lines:
@@ -302,103 +510,84 @@ def parse_translated_comments(translated_filename, translation_format, blocks_al
         if len(lines) != len(blocks_all):
             print("Error: The number of lines in the TSV translation file does not match the number of comment blocks.")
             sys.exit(1)
-        for block, line in zip(blocks_all, lines):
+        for i, line in enumerate(lines):
             # Remove the four-digit line number and the following space.
             line = line[5:]
             segments_translated = line.split(r'\t')
-            if len(segments_translated) != len(block["segments"]):
-                print(f"Error: Number of segments in a block does not match (File: {block['file']}, Block: {block['block_id']}).")
+            seg_indices = blocks_all.seg_index[blocks_all.segment_slice(i)]
+            if len(segments_translated) != len(seg_indices):
+                print(f"Error: Number of segments in a block does not match (File: {blocks_all.block_file[i]}, Block: {blocks_all.block_id[i]}).")
                 sys.exit(1)
-            for (idx, _), trans in zip(block["segments"], segments_translated):
-                translation_mapping[idx] = trans
+            translation_mapping.update(zip(seg_indices, segments_translated))
     elif translation_format == "bulk":
-        block_translations = []
-        current_block_lines = []
-        for line in lines:
-            if line.startswith("<||") and line.endswith("||>"):
-                if current_block_lines:
-                    block_translations.append(current_block_lines)
-                    current_block_lines = []
-            else:
-                if line.strip() == "" and not current_block_lines:
-                    continue
-                current_block_lines.append(line)
-        if current_block_lines:
-            block_translations.append(current_block_lines)
+        # Splitting on the delimiter lines yields the text before the first delimiter,
+        # followed by the text of each block. Blank lines around a block's text are ignored.
+        chunks = BULK_DELIMITER_PATTERN.split(content)
+        if not chunks[0].strip():
+            chunks.pop(0)
+        block_translations = [chunk.strip("\n").split("\n") for chunk in chunks]
         if len(block_translations) != len(blocks_all):
             print("Error: The number of blocks in the bulk translation file does not match the extraction.")
             sys.exit(1)
-        for block, trans_lines in zip(blocks_all, block_translations):
-            if len(trans_lines) != len(block["segments"]):
-                print(f"Error: Block segment count mismatch in bulk translation for file {block['file']} block {block['block_id']}.")
+        for i, trans_lines in enumerate(block_translations):
+            seg_indices = blocks_all.seg_index[blocks_all.segment_slice(i)]
+            if len(trans_lines) != len(seg_indices):
+                print(f"Error: Block segment count mismatch in bulk translation for file {blocks_all.block_file[i]} block {blocks_all.block_id[i]}.")
                 sys.exit(1)
-            for (idx, _), trans in zip(block["segments"], trans_lines):
-                translation_mapping[idx] = trans
+            translation_mapping.update(zip(seg_indices, trans_lines))
     else:
         print("Error: Unknown translation format.")
         sys.exit(1)
     return translation_mapping
 
-def reinsert_translations(intermediary_dir, output_dir, translation_mapping, do_escape_tabs):
+def reinsert_translations(sources, output_dir, translation_mapping, do_escape_tabs):
     """
-    Walk through the intermediary_dir, replace placeholders with translated text from the translation mapping,
-    and write the resulting files to output_dir, preserving the original relative paths.
+    For each (original_file, new_content) pair in sources, replace placeholders with translated text from
+    the translation mapping and write the resulting file to output_dir, preserving the original relative path.
+    The placeholder content is taken from memory, so the intermediary files are never read back.
+    Returns a tuple (placeholders_replaced, total_output_size), the latter in bytes.
     
     If do_escape_tabs is True, then the translation mapping values are processed with unescape_tabs() before insertion.
     """
+    if do_escape_tabs:
+        # Unescape each translation once up front rather than once per replaced placeholder.
+        translation_mapping = {index: unescape_tabs(text) for index, text in translation_mapping.items()}
     total_placeholders_replaced = 0
+    total_output_size = 0
 
-    for root, dirs, files in os.walk(intermediary_dir):
-        for file in files:
-            in_path = os.path.join(root, file)
-            with open(in_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            def repl(match):
-                nonlocal total_placeholders_replaced
-                ph = match.group()
-                index = ph.replace("PLACEHOLDER_", "").strip()
-                if index in translation_mapping:
-                    total_placeholders_replaced += 1
-                    trans_text = translation_mapping[index]
-                    if do_escape_tabs:
-                        trans_text = unescape_tabs(trans_text)
-                    return trans_text
-                else:
-                    print(f"Warning: No translation found for placeholder {index}")
-                    return ph
-            new_content = re.sub(r'PLACEHOLDER_[\w\-\d\.]+', repl, content)
-            rel_path = os.path.relpath(in_path, intermediary_dir)
-            out_path = os.path.join(output_dir, rel_path)
-            os.makedirs(os.path.dirname(out_path), exist_ok=True)
-            with open(out_path, "w", encoding="utf-8") as f:
-                f.write(new_content)
-    return total_placeholders_replaced
-
-def verification_checks(original_files, intermediary_dir, output_dir, translation_mapping):
+    for original_file, content in sources:
+        # Placeholders are substituted in place without a per-match Python callback.
+        parts = PLACEHOLDER_PATTERN.split(content)
+        for i in range(1, len(parts), 2):
+            index = parts[i]
+            trans_text = translation_mapping.get(index)
+            if trans_text is None:
+                print(f"Warning: No translation found for placeholder {index}")
+                parts[i] = "PLACEHOLDER_" + index
+                continue
+            total_placeholders_replaced += 1
+            parts[i] = trans_text
+        new_content = "".join(parts)
+        rel_path = os.path.relpath(original_file, os.getcwd())
+        out_path = os.path.join(output_dir, rel_path)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        total_output_size += write_source_file(out_path, new_content)
+    return total_placeholders_replaced, total_output_size
+
+def verification_checks(total_placeholders, total_intermediary_size, total_output_size, translation_mapping):
     """
     Perform basic verification:
       - Compare the number of placeholders in the intermediary files with the expected number.
       - Compare file sizes between intermediary and output files.
+
+    The placeholder count and file sizes are collected while the files are written,
+    so neither directory has to be walked or read again here.
     """
-    placeholder_pattern = re.compile(r'PLACEHOLDER_[\w\-\d\.]+')
-    total_placeholders = 0
-    total_intermediary_size = 0
-    for root, dirs, files in os.walk(intermediary_dir):
-        for file in files:
-            path = os.path.join(root, file)
-            total_intermediary_size += os.path.getsize(path)
-            with open(path, "r", encoding="utf-8") as f:
-                content = f.read()
-            total_placeholders += len(placeholder_pattern.findall(content))
     expected = len(translation_mapping)
     print(f"Placeholders in intermediary files: {total_placeholders}")
     print(f"Expected translations: {expected}")
     if total_placeholders < expected:
         print("Warning: Fewer placeholders found than expected!")
-    total_output_size = 0
-    for root, dirs, files in os.walk(output_dir):
-        for file in files:
-            total_output_size += os.path.getsize(os.path.join(root, file))
     size_diff = abs(total_intermediary_size - total_output_size)
     print(f"Total intermediary files size: {total_intermediary_size} bytes")
     print(f"Total output files size: {total_output_size} bytes")
@@ -417,30 +606,36 @@ def main():
         sys.exit(1)
     print(f"Found {len(file_list)} file(s) to process.")
 
-    intermediary_dir = os.path.join(os.getcwd(), "intermediary_dir")
-    if os.path.exists(intermediary_dir):
-        shutil.rmtree(intermediary_dir)
-    os.makedirs(intermediary_dir)
-    print(f"Intermediary directory created at: {intermediary_dir}")
-
-    all_blocks = []
-    for file in file_list:
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                content = f.read()
-        except Exception as e:
-            print(f"Error reading {file}: {e}")
-            continue
-        new_content, blocks = extract_comments_from_content(content, file)
-        all_blocks.extend(blocks)
-        write_intermediary_file(file, new_content, intermediary_dir)
+    intermediary_dir = None
+    if args.keep_intermediary:
+        intermediary_dir = os.path.join(os.getcwd(), "intermediary_dir")
+        if os.path.exists(intermediary_dir):
+            shutil.rmtree(intermediary_dir)
+        os.makedirs(intermediary_dir)
+        print(f"Intermediary directory created at: {intermediary_dir}")
+
+    all_blocks = CommentBlocks()
+    sources = []
+    total_intermediary_size = 0
+    # Files are independent, so extraction is spread across worker processes.
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(process_file, file_list, repeat(intermediary_dir), repeat(args.escape_tabs),
+                               chunksize=8)
+        for file, (new_content, blocks, intermediary_size, error) in zip(file_list, results):
+            if error is not None:
+                print(f"Error reading {file}: {error}")
+                continue
+            sources.append((file, new_content))
+            all_blocks.extend(blocks)
+            total_intermediary_size += intermediary_size
 
     base_dir = os.getcwd()
-    generate_excel_report(excel_rows, args.output)
-    generate_translation_files(all_blocks, base_dir, args.escape_tabs)
+    total_segments = len(all_blocks.seg_index)
+    generate_excel_report(iter_excel_rows(all_blocks), args.output)
+    generate_translation_files(all_blocks, base_dir)
 
     print("\n=== Extraction Phase Complete ===")
-    print(f"Extracted {len(excel_rows)} comment segments from {len(file_list)} files.")
+    print(f"Extracted {total_segments} comment segments from {len(file_list)} files.")
 
     prompt_for_translation()
 
@@ -458,10 +653,11 @@ def main():
         shutil.rmtree(output_dir)
     os.makedirs(output_dir)
 
-    placeholders_replaced = reinsert_translations(intermediary_dir, output_dir, translation_mapping, args.escape_tabs)
+    placeholders_replaced, total_output_size = reinsert_translations(sources, output_dir, translation_mapping, args.escape_tabs)
     print(f"Total placeholders replaced: {placeholders_replaced}")
 
-    verification_checks(file_list, intermediary_dir, output_dir, translation_mapping)
+    # Every extracted segment was replaced by exactly one placeholder.
+    verification_checks(total_segments, total_intermediary_size, total_output_size, translation_mapping)
     print(f"\nAll translated files are available in the directory: {output_dir}")
 
 if __name__ == "__main__":